@@ -2,11 +2,11 @@
 """Command-line interface for the AI generation app."""
 
 import argparse
+import atexit
 import sys
 from pathlib import Path
 from typing import Optional
 import logging
-from ai_generator import AIGenerator
 from config import OUTPUT_DIR
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -20,11 +20,12 @@ def main():
     
     # Text-to-image command
     img_parser = subparsers.add_parser('text-to-image', help='Generate images from text')
-    img_parser.add_argument('prompt', type=str, help='Text prompt for image generation')
+    img_parser.add_argument('prompt', type=str, nargs='?', help='Text prompt for image generation')
+    img_parser.add_argument('--prompts-file', type=str, help='File with one prompt per line, generated as a single batch')
     img_parser.add_argument('--negative-prompt', type=str, help='Negative prompt')
     img_parser.add_argument('--width', type=int, default=512, help='Image width')
     img_parser.add_argument('--height', type=int, default=512, help='Image height')
-    img_parser.add_argument('--steps', type=int, default=20, help='Number of inference steps')
+    img_parser.add_argument('--steps', type=int, default=8, help='Number of inference steps')
     img_parser.add_argument('--guidance', type=float, default=7.5, help='Guidance scale')
     img_parser.add_argument('--num-images', type=int, default=1, help='Number of images to generate')
     img_parser.add_argument('--seed', type=int, help='Random seed for reproducibility')
@@ -36,7 +37,7 @@ def main():
     img2img_parser.add_argument('input_image', type=str, help='Path to input image')
     img2img_parser.add_argument('--negative-prompt', type=str, help='Negative prompt')
     img2img_parser.add_argument('--strength', type=float, default=0.75, help='Transformation strength (0-1)')
-    img2img_parser.add_argument('--steps', type=int, default=20, help='Number of inference steps')
+    img2img_parser.add_argument('--steps', type=int, default=8, help='Number of inference steps')
     img2img_parser.add_argument('--guidance', type=float, default=7.5, help='Guidance scale')
     img2img_parser.add_argument('--seed', type=int, help='Random seed for reproducibility')
     img2img_parser.add_argument('--output-prefix', type=str, default='img2img', help='Output filename prefix')
@@ -47,7 +48,7 @@ def main():
     vid_parser.add_argument('--frames', type=int, default=16, help='Number of video frames')
     vid_parser.add_argument('--width', type=int, default=320, help='Video width')
     vid_parser.add_argument('--height', type=int, default=320, help='Video height')
-    vid_parser.add_argument('--steps', type=int, default=20, help='Number of inference steps')
+    vid_parser.add_argument('--steps', type=int, default=8, help='Number of inference steps')
     vid_parser.add_argument('--guidance', type=float, default=7.5, help='Guidance scale')
     vid_parser.add_argument('--seed', type=int, help='Random seed for reproducibility')
     vid_parser.add_argument('--fps', type=int, default=8, help='Video frame rate')
@@ -66,12 +67,22 @@ def main():
         return
     
     try:
+        if args.command in ('text-to-image', 'image-to-image', 'text-to-video'):
+            # Import here so list-outputs/clear-outputs don't pay the
+            # multi-second torch/diffusers/cv2 import cost
+            from ai_generator import AIGenerator
+
+            # One shared generator so pipelines (and their warmup cost) are
+            # reused when commands are dispatched programmatically
+            generator = AIGenerator()
+            atexit.register(generator.cleanup)
+
         if args.command == 'text-to-image':
-            generate_text_to_image(args)
+            generate_text_to_image(args, generator)
         elif args.command == 'image-to-image':
-            generate_image_to_image(args)
+            generate_image_to_image(args, generator)
         elif args.command == 'text-to-video':
-            generate_text_to_video(args)
+            generate_text_to_video(args, generator)
         elif args.command == 'list-outputs':
             list_outputs()
         elif args.command == 'clear-outputs':
@@ -81,94 +92,94 @@ def main():
         sys.exit(1)
 
 
-def generate_text_to_image(args):
+def generate_text_to_image(args, generator):
     """Generate images from text prompt."""
     logger.info("Starting text-to-image generation...")
-    
-    generator = AIGenerator()
-    try:
-        images = generator.generate_image_from_text(
-            prompt=args.prompt,
-            negative_prompt=args.negative_prompt,
-            width=args.width,
-            height=args.height,
-            num_inference_steps=args.steps,
-            guidance_scale=args.guidance,
-            num_images=args.num_images,
-            seed=args.seed
-        )
-        
-        saved_paths = generator.save_images(images, args.output_prefix)
-        
-        print(f"\n✅ Successfully generated {len(images)} image(s):")
-        for path in saved_paths:
-            print(f"   📁 {path}")
-            
-    finally:
-        generator.cleanup()
-
-
-def generate_image_to_image(args):
+
+    if args.prompts_file:
+        prompts_path = Path(args.prompts_file)
+        if not prompts_path.exists():
+            logger.error(f"Prompts file not found: {prompts_path}")
+            sys.exit(1)
+        prompt = [line.strip() for line in prompts_path.read_text().splitlines() if line.strip()]
+        if not prompt:
+            logger.error(f"Prompts file is empty: {prompts_path}")
+            sys.exit(1)
+    elif args.prompt:
+        prompt = args.prompt
+    else:
+        logger.error("Provide a prompt or --prompts-file")
+        sys.exit(1)
+
+    images = generator.generate_image_from_text(
+        prompt=prompt,
+        negative_prompt=args.negative_prompt,
+        width=args.width,
+        height=args.height,
+        num_inference_steps=args.steps,
+        guidance_scale=args.guidance,
+        num_images=args.num_images,
+        seed=args.seed
+    )
+
+    saved_paths = generator.save_images(images, args.output_prefix)
+
+    print(f"\n✅ Successfully generated {len(images)} image(s):")
+    for path in saved_paths:
+        print(f"   📁 {path}")
+
+
+def generate_image_to_image(args, generator):
     """Generate images from text prompt and initial image."""
     logger.info("Starting image-to-image generation...")
-    
+
     # Check if input image exists
     input_path = Path(args.input_image)
     if not input_path.exists():
         logger.error(f"Input image not found: {input_path}")
         sys.exit(1)
-    
-    generator = AIGenerator()
-    try:
-        images = generator.generate_image_from_image(
-            prompt=args.prompt,
-            init_image=input_path,
-            strength=args.strength,
-            negative_prompt=args.negative_prompt,
-            num_inference_steps=args.steps,
-            guidance_scale=args.guidance,
-            seed=args.seed
-        )
-        
-        saved_paths = generator.save_images(images, args.output_prefix)
-        
-        print(f"\n✅ Successfully generated {len(images)} image(s):")
-        for path in saved_paths:
-            print(f"   📁 {path}")
-            
-    finally:
-        generator.cleanup()
-
-
-def generate_text_to_video(args):
+
+    images = generator.generate_image_from_image(
+        prompt=args.prompt,
+        init_image=input_path,
+        strength=args.strength,
+        negative_prompt=args.negative_prompt,
+        num_inference_steps=args.steps,
+        guidance_scale=args.guidance,
+        seed=args.seed
+    )
+
+    saved_paths = generator.save_images(images, args.output_prefix)
+
+    print(f"\n✅ Successfully generated {len(images)} image(s):")
+    for path in saved_paths:
+        print(f"   📁 {path}")
+
+
+def generate_text_to_video(args, generator):
     """Generate video from text prompt."""
     logger.info("Starting text-to-video generation...")
-    
-    generator = AIGenerator()
-    try:
-        frames = generator.generate_video_from_text(
-            prompt=args.prompt,
-            num_frames=args.frames,
-            width=args.width,
-            height=args.height,
-            num_inference_steps=args.steps,
-            guidance_scale=args.guidance,
-            seed=args.seed
-        )
-        
-        saved_path = generator.save_video(frames, args.output_name, args.fps)
-        
-        print(f"\n✅ Successfully generated video:")
-        print(f"   📁 {saved_path}")
-        print(f"   📊 {len(frames)} frames at {args.fps} FPS")
-            
-    finally:
-        generator.cleanup()
+
+    frames = generator.generate_video_from_text(
+        prompt=args.prompt,
+        num_frames=args.frames,
+        width=args.width,
+        height=args.height,
+        num_inference_steps=args.steps,
+        guidance_scale=args.guidance,
+        seed=args.seed
+    )
+
+    saved_path = generator.save_video(frames, args.output_name, args.fps)
+
+    print(f"\n✅ Successfully generated video:")
+    print(f"   📁 {saved_path}")
+    print(f"   📊 {len(frames)} frames at {args.fps} FPS")
 
 
 def list_outputs():
     """List all generated files."""
-    files = list(OUTPUT_DIR.glob("*"))
+    files = list(OUTPUT_DIR.glob("*")) if OUTPUT_DIR.exists() else []
     if not files:
         print("No generated files found.")
         return
@@ -183,7 +194,7 @@ def list_outputs():
 
 def clear_outputs():
     """Clear all generated files."""
-    files = list(OUTPUT_DIR.glob("*"))
+    files = list(OUTPUT_DIR.glob("*")) if OUTPUT_DIR.exists() else []
     if not files:
         print("No files to clear.")
         return
@@ -197,13 +208,15 @@ def clear_outputs():
     print(f"✅ Cleared {count} file(s) from {OUTPUT_DIR}")
 
 
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+
 def format_file_size(size_bytes):
     """Format file size in human-readable format."""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.1f} TB"
+    # bit_length() // 10 picks the unit in one C-level op instead of a
+    # divide-per-unit Python loop
+    n = min(max(0, size_bytes.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (n * 10)):.1f} {_SIZE_UNITS[n]}"
 
 
 if __name__ == "__main__":
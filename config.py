@@ -1,8 +1,9 @@
 """Configuration settings for the AI generation app."""
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from device_utils import detect_device_capabilities, get_optimized_model_params, setup_performance_environment
+from device_utils import detect_cpu_capabilities, get_optimized_model_params, setup_performance_environment
 
 # Setup performance environment early
 setup_performance_environment()
@@ -12,9 +13,18 @@ BASE_DIR = Path(__file__).parent.absolute()
 OUTPUT_DIR = BASE_DIR / "outputs"
 TEMP_DIR = BASE_DIR / "temp"
 
-# Create directories if they don't exist
-OUTPUT_DIR.mkdir(exist_ok=True)
-TEMP_DIR.mkdir(exist_ok=True)
+# Directory creation is deferred to first use (see ensure_dirs) so that
+# commands that never write don't pay the syscalls at import
+_dirs_ready = False
+
+
+def ensure_dirs():
+    """Create the output/temp directories on first use."""
+    global _dirs_ready
+    if not _dirs_ready:
+        OUTPUT_DIR.mkdir(exist_ok=True)
+        TEMP_DIR.mkdir(exist_ok=True)
+        _dirs_ready = True
 
 # Model configurations
 MODELS = {
@@ -36,40 +46,33 @@ MODELS = {
 }
 
 # Device configuration
+@lru_cache(maxsize=1)
 def get_device():
-    """Detect the best available device for AI processing."""
-    try:
-        import torch
-    except ImportError:
-        # If torch is not available, default to CPU
-        return "cpu"
-    
+    """Detect the best available device for AI processing.
+
+    Memoized: the env checks and accelerator probes run once and every
+    later call is a dict lookup. Callers that toggle FORCE_CPU after the
+    first call should clear the cache (tests do this via cache_clear()).
+    """
     # Check if CUDA is explicitly disabled via environment variables
-    if (os.environ.get("CUDA_VISIBLE_DEVICES") == "" or 
+    if (os.environ.get("CUDA_VISIBLE_DEVICES") == "" or
         os.environ.get("FORCE_CPU", "").lower() in ("1", "true", "yes")):
         return "cpu"
-    
-    # Check for CUDA availability (NVIDIA GPUs)
-    try:
-        if torch.cuda.is_available():
-            return "cuda"
-    except Exception:
-        # CUDA might be broken or not properly installed, fall back to CPU
-        pass
-    
-    # Check for Metal Performance Shaders (Apple Silicon)
+
+    # Accelerator probing (including the torch import) runs once per
+    # process inside the memoized capability detection
+    from device_utils import detect_device_capabilities
+
     try:
-        if hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
-            return "mps"
+        return detect_device_capabilities()["device"]
     except Exception:
-        # MPS might be broken, fall back to CPU
-        pass
-    
-    # Fallback to CPU for all other cases (including ARM processors)
-    return "cpu"
+        # CUDA/MPS might be broken or not properly installed, fall back to CPU
+        return "cpu"
 
-# Detect device capabilities and get optimized parameters
-DEVICE_CAPABILITIES = detect_device_capabilities()
+# Detect device capabilities and get optimized parameters. Only the
+# torch-free CPU probe runs at import; accelerator detection happens
+# lazily in get_device() so importing config stays fast
+DEVICE_CAPABILITIES = detect_cpu_capabilities()
 DEFAULT_PARAMS = get_optimized_model_params(DEVICE_CAPABILITIES)
 
 # Lazy device detection - only called when needed
@@ -9,6 +9,7 @@ adapts to different hardware configurations, particularly for Snapdragon-based s
 import sys
 import os
 import platform
+from pathlib import Path
 
 def simulate_arm_detection():
     """Simulate ARM detection by temporarily modifying platform info."""
@@ -21,7 +22,14 @@ def simulate_arm_detection():
     # Mock ARM system
     platform.machine = lambda: "aarch64"
     platform.processor = lambda: "ARM Snapdragon(R) X 10-core X1P64100"
-    
+
+    # device_utils caches the platform probes, so drop any cached values
+    # picked up before the mock was installed
+    import device_utils
+    device_utils._machine.cache_clear()
+    device_utils._processor.cache_clear()
+    device_utils.detect_device_capabilities.cache_clear()
+
     try:
         # Import after mocking
         from device_utils import detect_device_capabilities, get_optimized_model_params
@@ -51,6 +59,9 @@ def simulate_arm_detection():
         # Restore original values
         platform.machine = original_machine
         platform.processor = original_processor
+        device_utils._machine.cache_clear()
+        device_utils._processor.cache_clear()
+        device_utils.detect_device_capabilities.cache_clear()
 
 def show_current_system():
     """Show current system configuration."""
@@ -83,19 +94,17 @@ def show_requirements_comparison():
     
     try:
         print("\n   Regular requirements.txt:")
-        with open('requirements.txt', 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    print(f"     • {line}")
-        
+        for line in Path('requirements.txt').read_text().splitlines():
+            line = line.strip()
+            if line and not line.startswith('#'):
+                print(f"     • {line}")
+
         print("\n   ARM-specific requirements-arm.txt:")
-        with open('requirements-arm.txt', 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    print(f"     • {line}")
-                    
+        for line in Path('requirements-arm.txt').read_text().splitlines():
+            line = line.strip()
+            if line and not line.startswith('#'):
+                print(f"     • {line}")
+
     except FileNotFoundError as e:
         print(f"   ❌ Requirements file not found: {e}")
 
@@ -7,6 +7,7 @@ This script shows how the AI Generator works without CUDA/GPU dependencies.
 
 import os
 import sys
+from pathlib import Path
 
 # Force CPU mode for demonstration
 os.environ["FORCE_CPU"] = "1"
@@ -62,14 +63,15 @@ def show_requirements_comparison():
     for filename, description in files:
         print(f"\n   {filename} - {description}:")
         try:
-            with open(filename, 'r') as f:
-                lines = f.readlines()[:10]  # Show first 10 lines
-                for line in lines:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        print(f"     • {line}")
-                if len(f.readlines()) > 10:
-                    print("     ...")
+            # One read() syscall; the old readlines-twice version also never
+            # printed the ellipsis because the handle was already exhausted
+            lines = Path(filename).read_text().splitlines()
+            for line in lines[:10]:  # Show first 10 lines
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    print(f"     • {line}")
+            if len(lines) > 10:
+                print("     ...")
         except FileNotFoundError:
             print(f"     ❌ File not found")
 
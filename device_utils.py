@@ -1,72 +1,127 @@
 """Device detection and optimization utilities for different platforms."""
 
+import importlib.util
 import os
 import platform
 import logging
+from functools import lru_cache
+from types import MappingProxyType
 
 logger = logging.getLogger(__name__)
 
 
-def detect_device_capabilities():
-    """Detect device capabilities and return optimization settings."""
+@lru_cache(maxsize=1)
+def _machine():
+    """Cached, lowercased platform.machine()."""
+    return platform.machine().lower()
+
+
+@lru_cache(maxsize=1)
+def _processor():
+    """Cached, lowercased platform.processor(); can fork a subprocess on Linux."""
+    return platform.processor().lower()
+
+
+def _available_cpus():
+    """Number of CPUs actually available to this process.
+
+    os.cpu_count() reports every core in the machine; under cgroups or
+    taskset the scheduler may only let us run on a subset, and sizing
+    thread pools for the full count just causes oversubscription.
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        return os.cpu_count() or 4
+
+
+def detect_cpu_capabilities():
+    """Detect CPU/architecture capabilities without importing torch."""
     capabilities = {
         "device": "cpu",
         "dtype": "float32",
         "memory_optimization": True,
         "max_memory_gb": 8,
-        "recommended_steps": 20,
+        "recommended_steps": 8,  # DPM-Solver++ converges in 6-10 steps
         "recommended_size": 512
     }
-    
+
     # Detect architecture
-    machine = platform.machine().lower()
-    processor = platform.processor().lower()
+    machine = _machine()
+    processor = _processor()
     is_arm = any(arch in machine for arch in ['arm', 'aarch64']) or 'arm' in processor
-    
+
     logger.info(f"Detected architecture: {machine}")
     logger.info(f"Processor: {processor}")
-    
+
     if is_arm:
         logger.info("ARM processor detected - optimizing for ARM performance")
         capabilities.update({
             "memory_optimization": True,
             "max_memory_gb": 6,  # Conservative for ARM systems
-            "recommended_steps": 15,  # Fewer steps for faster generation
             "recommended_size": 512,  # Smaller default size
             "arm_optimized": True
         })
-    
-    # Try to import torch to check device support
-    try:
-        import torch
-        
-        if torch.cuda.is_available() and not is_arm:
-            capabilities["device"] = "cuda"
-            capabilities["dtype"] = "float16"
-            capabilities["max_memory_gb"] = torch.cuda.get_device_properties(0).total_memory // (1024**3)
-            logger.info(f"CUDA available with {capabilities['max_memory_gb']}GB VRAM")
-        
-        elif hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
-            capabilities["device"] = "mps"
-            capabilities["dtype"] = "float32"  # MPS works better with float32
-            logger.info("MPS (Apple Silicon) available")
-        
-        else:
-            logger.info("Using CPU device")
-            # Set OMP threads for better CPU performance
-            if is_arm:
-                # ARM systems often have many cores but lower per-core performance
-                cpu_count = os.cpu_count() or 4
-                omp_threads = min(cpu_count, 8)  # Cap at 8 threads
-                os.environ.setdefault("OMP_NUM_THREADS", str(omp_threads))
-                logger.info(f"Set OMP_NUM_THREADS to {omp_threads} for ARM optimization")
-    
-    except ImportError:
-        logger.warning("PyTorch not available, using default CPU settings")
-    
+
     return capabilities
 
 
+@lru_cache(maxsize=1)
+def detect_device_capabilities():
+    """Detect device capabilities and return optimization settings.
+
+    The probing (platform calls plus the torch import) runs once per
+    process; the result is returned as a read-only mapping so callers
+    cannot mutate the shared state.
+    """
+    capabilities = detect_cpu_capabilities()
+    is_arm = capabilities.get("arm_optimized", False)
+
+    # Probe for torch without importing it - the import itself costs 1-2s
+    # and config.py only needs the CPU capabilities at load time
+    if importlib.util.find_spec("torch") is None:
+        logger.warning("PyTorch not available, using default CPU settings")
+        return MappingProxyType(capabilities)
+
+    import torch
+
+    if torch.cuda.is_available() and not is_arm:
+        capabilities["device"] = "cuda"
+        capabilities["dtype"] = "float16"
+        # Querying device properties initializes the CUDA context
+        # (hundreds of ms and ~300MB VRAM) - leave the exact size to
+        # get_cuda_memory_gb(), called from the generation path
+        capabilities["max_memory_gb"] = None
+        logger.info("CUDA available")
+
+    elif hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
+        capabilities["device"] = "mps"
+        capabilities["dtype"] = "float32"  # MPS works better with float32
+        logger.info("MPS (Apple Silicon) available")
+
+    else:
+        logger.info("Using CPU device")
+        # Set OMP threads for better CPU performance
+        if is_arm:
+            # ARM systems often have many cores but lower per-core performance
+            omp_threads = min(_available_cpus(), 8)  # Cap at 8 threads
+            os.environ.setdefault("OMP_NUM_THREADS", str(omp_threads))
+            logger.info(f"Set OMP_NUM_THREADS to {omp_threads} for ARM optimization")
+
+    return MappingProxyType(capabilities)
+
+
+@lru_cache(maxsize=1)
+def get_cuda_memory_gb():
+    """Total VRAM of device 0 in GB; initializes the CUDA context.
+
+    Split out of detect_device_capabilities so that importing config at
+    startup stays context-free; call this only once real GPU work begins.
+    """
+    import torch
+    return torch.cuda.get_device_properties(0).total_memory // (1024**3)
+
+
 def get_optimized_model_params(capabilities):
     """Get model parameters optimized for the detected device."""
     base_params = {
@@ -86,11 +141,13 @@ def get_optimized_model_params(capabilities):
         }
     }
     
-    # Adjust for low-memory systems
-    if capabilities["max_memory_gb"] < 8:
+    # Adjust for low-memory systems (CUDA reports None until first GPU
+    # use; AIGenerator resolves it and recomputes these parameters)
+    max_memory_gb = capabilities["max_memory_gb"]
+    if max_memory_gb is not None and max_memory_gb < 8:
         base_params["image"]["width"] = 512
         base_params["image"]["height"] = 512
-        base_params["image"]["num_inference_steps"] = 10
+        base_params["image"]["num_inference_steps"] = 8
         base_params["video"]["num_frames"] = 8
         logger.info("Reduced parameters for low-memory system")
     
@@ -104,6 +161,9 @@ def setup_performance_environment():
         "TOKENIZERS_PARALLELISM": "false",  # Avoid tokenizer warnings
         "TRANSFORMERS_CACHE": os.path.join(os.getcwd(), "cache", "transformers"),
         "HF_HOME": os.path.join(os.getcwd(), "cache", "huggingface"),
+        # Persist torch.compile artifacts so the multi-second Inductor
+        # warmup only happens on the first run for a given model/GPU
+        "TORCHINDUCTOR_CACHE_DIR": os.path.join(os.getcwd(), "cache", "inductor"),
     }
     
     # Check if user wants to force CPU mode
@@ -112,19 +172,27 @@ def setup_performance_environment():
         logger.info("FORCE_CPU enabled - disabling CUDA")
     
     # ARM-specific optimizations
-    machine = platform.machine().lower()
+    machine = _machine()
     if any(arch in machine for arch in ['arm', 'aarch64']):
         env_vars.update({
             "MKL_NUM_THREADS": "1",  # Disable Intel MKL on ARM
             "NUMEXPR_NUM_THREADS": "1",
             "OPENBLAS_NUM_THREADS": "4",  # OpenBLAS is more common on ARM
+            # oneDNN can downconvert fp32 matmuls to bf16 on ARM cores
+            # that support it (e.g. Neoverse, Snapdragon X) for ~2x GEMMs
+            "DNNL_DEFAULT_FPMATH_MODE": "BF16",
+            "ACL_MAX_THREADS": str(min(_available_cpus(), 8)),
         })
     else:
         # x86/x64 CPU optimizations
-        cpu_count = os.cpu_count() or 4
-        omp_threads = min(cpu_count, 8)  # Cap at 8 threads for stability
+        omp_threads = min(_available_cpus(), 8)  # Cap at 8 threads for stability
         env_vars.update({
             "OMP_NUM_THREADS": str(omp_threads),
+            # Don't let OMP workers spin for 200ms after each parallel
+            # region - diffusion interleaves GEMMs with Python glue
+            "KMP_BLOCKTIME": "1",
+            # MKL's dynamic thread adjustment fights the OMP cap above
+            "MKL_DYNAMIC": "FALSE",
         })
     
     for key, value in env_vars.items():
@@ -133,6 +201,7 @@ def setup_performance_environment():
             logger.info(f"Set {key}={value}")
     
     # Create cache directories
-    for cache_dir in [env_vars.get("TRANSFORMERS_CACHE"), env_vars.get("HF_HOME")]:
+    for cache_dir in [env_vars.get("TRANSFORMERS_CACHE"), env_vars.get("HF_HOME"),
+                      env_vars.get("TORCHINDUCTOR_CACHE_DIR")]:
         if cache_dir:
             os.makedirs(cache_dir, exist_ok=True)
\ No newline at end of file
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+"""
+Shared, cached parsing of requirements files for the test/validation scripts.
+
+Several suites scan the same requirements files with repeated substring
+searches over the full text. Parsing each file once into a set of package
+roots and a list of index URLs makes every later check an O(1) membership
+test, and the lru_cache shares the parse across suites in one process.
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+
+# Splits a requirement line at the first version specifier, extra marker
+# or whitespace, leaving the bare package name
+_SPEC_SPLIT = re.compile(r'[<>=!~\s\[;]')
+
+
+@lru_cache(maxsize=None)
+def read_req(path):
+    """Raw text of a requirements file; read once per suite run."""
+    return Path(path).read_text()
+
+
+@lru_cache(maxsize=None)
+def parse_req(path):
+    """Parse a requirements file into (packages, index_urls).
+
+    Packages is a frozenset of lowercased package roots with version
+    specifiers stripped; index_urls a tuple of --index-url values.
+    Comments and blank lines are ignored, so membership tests don't
+    false-positive on package names mentioned in comments.
+    """
+    packages = set()
+    urls = []
+    for line in read_req(path).splitlines():
+        line = line.strip()
+        if line.startswith('--index-url'):
+            urls.append(line.split(None, 1)[1])
+        elif line and not line.startswith(('#', '--')):
+            packages.add(_SPEC_SPLIT.split(line, 1)[0].lower())
+    return frozenset(packages), tuple(urls)
@@ -16,129 +16,125 @@ os.environ["CUDA_VISIBLE_DEVICES"] = ""
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from test_runner import run_tests
+
+# torch.set_num_interop_threads can only be called once per process
+_torch_threads_pinned = False
+
+
+def _pin_torch_threads():
+    """Pin torch intra/inter-op thread counts once, if torch is installed."""
+    global _torch_threads_pinned
+    if _torch_threads_pinned:
+        return
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(int(os.environ["OMP_NUM_THREADS"]))
+    torch.set_num_interop_threads(1)
+    _torch_threads_pinned = True
+
+
 def test_imports():
     """Test that all modules can be imported without CUDA dependencies."""
     print("🧪 Testing imports without CUDA dependencies...")
     
-    try:
-        # Test basic imports
-        import config
-        print("✅ Config module imported successfully")
-        
-        import device_utils
-        print("✅ Device utils imported successfully")
-        
-        # Test device detection
-        device = config.get_device()
-        print(f"✅ Device detected: {device}")
-        assert device == "cpu", f"Expected CPU device, got {device}"
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Import test failed: {e}")
-        return False
+    # Test basic imports
+    import config
+    print("✅ Config module imported successfully")
+
+    import device_utils
+    print("✅ Device utils imported successfully")
+
+    # Test device detection
+    device = config.get_device()
+    print(f"✅ Device detected: {device}")
+    assert device == "cpu", f"Expected CPU device, got {device}"
+
+    return True
 
 def test_device_capabilities():
     """Test device capability detection in CPU-only mode."""
     print("\n🔧 Testing device capabilities...")
     
-    try:
-        from device_utils import detect_device_capabilities, get_optimized_model_params
-        
-        capabilities = detect_device_capabilities()
-        print(f"✅ Capabilities detected: {capabilities}")
-        
-        # Verify CPU device
-        assert capabilities["device"] == "cpu", f"Expected CPU device, got {capabilities['device']}"
-        
-        # Test optimized parameters
-        params = get_optimized_model_params(capabilities)
-        print(f"✅ Optimized parameters: {params}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Device capabilities test failed: {e}")
-        return False
+    from device_utils import detect_device_capabilities, get_optimized_model_params
+
+    capabilities = detect_device_capabilities()
+    print(f"✅ Capabilities detected: {capabilities}")
+
+    # Verify CPU device
+    assert capabilities["device"] == "cpu", f"Expected CPU device, got {capabilities['device']}"
+
+    # Test optimized parameters
+    params = get_optimized_model_params(capabilities)
+    print(f"✅ Optimized parameters: {params}")
+
+    return True
 
 def test_ai_generator_cpu_only():
     """Test AI Generator initialization in CPU-only mode."""
     print("\n🤖 Testing AI Generator in CPU-only mode...")
     
+    # This will only work if dependencies are installed; the narrow
+    # guard covers just the optional import
     try:
-        # This will only work if dependencies are installed
-        try:
-            from ai_generator import AIGenerator
-        except ImportError as e:
-            print(f"⚠️  AI Generator dependencies not installed: {e}")
-            print("   This is expected in a test environment without torch/diffusers")
-            return True  # Not a failure, just missing dependencies
-        
-        # Initialize generator
-        generator = AIGenerator()
-        print(f"✅ AI Generator initialized on device: {generator.device}")
-        
-        # Verify CPU device
-        assert generator.device == "cpu", f"Expected CPU device, got {generator.device}"
-        
-        # Test capabilities
-        print(f"✅ Generator capabilities: {generator.capabilities}")
-        
-        # Cleanup
-        generator.cleanup()
-        print("✅ Generator cleanup completed")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ AI Generator test failed: {e}")
-        return False
+        from ai_generator import AIGenerator
+    except ImportError as e:
+        print(f"⚠️  AI Generator dependencies not installed: {e}")
+        print("   This is expected in a test environment without torch/diffusers")
+        return True  # Not a failure, just missing dependencies
+
+    # Initialize generator
+    generator = AIGenerator()
+    print(f"✅ AI Generator initialized on device: {generator.device}")
+
+    # Verify CPU device
+    assert generator.device == "cpu", f"Expected CPU device, got {generator.device}"
+
+    # Test capabilities
+    print(f"✅ Generator capabilities: {generator.capabilities}")
+
+    # Cleanup
+    generator.cleanup()
+    print("✅ Generator cleanup completed")
+
+    return True
 
 def test_environment_variables():
     """Test that environment variables are properly set for CPU-only mode."""
     print("\n🌍 Testing environment variables...")
     
-    try:
-        # Check FORCE_CPU
-        assert os.environ.get("FORCE_CPU") == "1", "FORCE_CPU not set"
-        print("✅ FORCE_CPU environment variable set")
-        
-        # Check CUDA_VISIBLE_DEVICES
-        assert os.environ.get("CUDA_VISIBLE_DEVICES") == "", "CUDA_VISIBLE_DEVICES not empty"
-        print("✅ CUDA_VISIBLE_DEVICES disabled")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Environment variables test failed: {e}")
-        return False
+    # Check FORCE_CPU
+    assert os.environ.get("FORCE_CPU") == "1", "FORCE_CPU not set"
+    print("✅ FORCE_CPU environment variable set")
+
+    # Check CUDA_VISIBLE_DEVICES
+    assert os.environ.get("CUDA_VISIBLE_DEVICES") == "", "CUDA_VISIBLE_DEVICES not empty"
+    print("✅ CUDA_VISIBLE_DEVICES disabled")
+
+    # Pin thread counts so CPU inference behaves like a tuned
+    # deployment; torch's defaults oversubscribe many-core CI boxes
+    os.environ.setdefault("OMP_NUM_THREADS", "2")
+    os.environ.setdefault("MKL_NUM_THREADS", "2")
+    _pin_torch_threads()
+    print("✅ CPU thread counts pinned")
+
+    return True
 
 def main():
     """Run all CPU-only tests."""
     print("🧪 CPU-Only Compatibility Test Suite")
     print("=" * 50)
     
-    tests = [
-        test_environment_variables,
-        test_imports,
-        test_device_capabilities,
-        test_ai_generator_cpu_only
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-            else:
-                failed += 1
-        except Exception as e:
-            print(f"❌ Test {test.__name__} crashed: {e}")
-            failed += 1
-    
+    # The environment check must run (and its env vars must be in place)
+    # before the other tests start; those three are independent and
+    # overlap their import/file I/O in threads
+    passed, failed = run_tests(
+        [test_imports, test_device_capabilities, test_ai_generator_cpu_only],
+        first=[test_environment_variables]
+    )
+
     print(f"\n📊 Test Results: {passed} passed, {failed} failed")
     
     if failed == 0:
@@ -2,139 +2,197 @@
 
 """
 Simulation test for AI Generator CPU-only mode with mock dependencies.
-This test simulates having PyTorch available and tests the attention_slicing logic.
+This test simulates having PyTorch available and tests the memory-optimization logic.
 """
 
+import copy
+import importlib
 import os
 import sys
-from unittest.mock import Mock, patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from test_runner import run_tests
 
 # Force CPU mode
 os.environ["FORCE_CPU"] = "1"
 os.environ["CUDA_VISIBLE_DEVICES"] = ""
 
+
+class Counted:
+    """Minimal callable stub that just counts its calls.
+
+    Mock carries call recording, child-mock creation and spec machinery
+    we never use; the simulation only ever asserts on call counts.
+    """
+
+    def __init__(self, side_effect=None):
+        self.calls = 0
+        self.side_effect = side_effect
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        if self.side_effect is not None:
+            raise self.side_effect
+
+
+# torch.set_num_interop_threads can only be called once per process
+_torch_threads_pinned = False
+
+
+def _pin_torch_threads():
+    """Pin torch intra/inter-op thread counts once, if torch is installed."""
+    global _torch_threads_pinned
+    if _torch_threads_pinned:
+        return
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(int(os.environ["OMP_NUM_THREADS"]))
+    torch.set_num_interop_threads(1)
+    _torch_threads_pinned = True
+
+
+def _reset_modules(*names):
+    """Drop cached project modules so a fresh import sees patched stubs.
+
+    Without this, an ai_generator/config imported by an earlier test (or
+    another suite in the same process) keeps its original torch binding
+    and the sys.modules patch is silently ignored.
+    """
+    importlib.invalidate_caches()
+    for name in names:
+        sys.modules.pop(name, None)
+
+
 def create_mock_torch():
-    """Create a mock torch module that simulates CPU-only environment."""
-    mock_torch = Mock()
-    mock_torch.cuda.is_available.return_value = False
-    mock_torch.float32 = "float32"
-    mock_torch.float16 = "float16"
-    
-    # Mock generator
-    mock_generator = Mock()
-    mock_generator.manual_seed.return_value = mock_generator
-    mock_torch.Generator.return_value = mock_generator
-    
-    # Mock backends
-    mock_torch.backends.mps.is_available.return_value = False
-    
-    return mock_torch
+    """Create a stub torch module that simulates CPU-only environment."""
+    # SimpleNamespace attribute access is a plain dict lookup; every Mock
+    # attribute access would allocate a child Mock instead
+    mock_generator = SimpleNamespace()
+    mock_generator.manual_seed = lambda seed: mock_generator
+
+    return SimpleNamespace(
+        float32="float32",
+        float16="float16",
+        cuda=SimpleNamespace(is_available=lambda: False),
+        backends=SimpleNamespace(mps=SimpleNamespace(is_available=lambda: False)),
+        Generator=lambda *args, **kwargs: mock_generator,
+    )
 
 def create_mock_pipeline():
-    """Create a mock diffusers pipeline."""
-    mock_pipeline = Mock()
-    mock_pipeline.enable_attention_slicing = Mock()
-    mock_pipeline.enable_xformers_memory_efficient_attention = Mock(side_effect=ImportError("xformers not available"))
-    mock_pipeline.to.return_value = mock_pipeline
+    """Create a stub diffusers pipeline."""
+    mock_pipeline = SimpleNamespace()
+    mock_pipeline.enable_attention_slicing = Counted()
+    mock_pipeline.enable_xformers_memory_efficient_attention = Counted(
+        side_effect=ImportError("xformers not available"))
+    mock_pipeline.vae = SimpleNamespace(enable_tiling=Counted(),
+                                        enable_slicing=Counted())
+    mock_pipeline.scheduler = SimpleNamespace(config={})
+    mock_pipeline.to = lambda *args, **kwargs: mock_pipeline
     return mock_pipeline
 
-def test_attention_slicing_fallback():
-    """Test that attention_slicing is used when xformers is not available."""
-    print("🧪 Testing attention_slicing fallback mechanism...")
-    
-    try:
-        mock_torch = create_mock_torch()
-        mock_pipeline = create_mock_pipeline()
-        
-        with patch.dict('sys.modules', {
-            'torch': mock_torch,
-            'diffusers': Mock(),
-            'PIL': Mock(),
-            'cv2': Mock(),
-            'numpy': Mock()
-        }):
-            # Mock the pipeline creation
-            with patch('diffusers.StableDiffusionPipeline') as mock_sd_pipeline:
-                mock_sd_pipeline.from_pretrained.return_value = mock_pipeline
-                
-                # Import and test our AI generator
-                from ai_generator import AIGenerator
-                
-                # Initialize generator
-                generator = AIGenerator()
-                
-                # Load a pipeline to trigger the optimization logic
-                generator._load_pipeline("text_to_image")
-                
-                # Verify that attention_slicing was called
-                mock_pipeline.enable_attention_slicing.assert_called_once()
-                print("✅ attention_slicing was correctly enabled for CPU mode")
-                
-                # Verify xformers was attempted but failed gracefully
-                mock_pipeline.enable_xformers_memory_efficient_attention.assert_called_once()
-                print("✅ xformers fallback handled gracefully")
-                
-                # Verify device is CPU
-                assert generator.device == "cpu", f"Expected CPU device, got {generator.device}"
-                print("✅ Device correctly detected as CPU")
-                
-                return True
-                
-    except Exception as e:
-        print(f"❌ Attention slicing test failed: {e}")
-        return False
+
+# The torch stub is stateless, so build it once and hand tests shallow
+# copies; a test overriding an attribute must replace the whole nested
+# namespace (not mutate it) to keep the prototype pristine. The pipeline
+# stub carries per-test Counted state and is built fresh each time.
+_TORCH_PROTOTYPE = create_mock_torch()
+
+def test_vae_tiling_memory_optimization():
+    """Test that VAE tiling/slicing handles the decode memory spike on CPU."""
+    print("🧪 Testing VAE tiling memory optimization...")
+
+    mock_torch = copy.copy(_TORCH_PROTOTYPE)
+    mock_pipeline = create_mock_pipeline()
+
+    _reset_modules('ai_generator', 'config', 'device_utils')
+    with patch.dict('sys.modules', {
+        'torch': mock_torch,
+        'diffusers': Mock(),
+        'PIL': Mock(),
+        'cv2': Mock(),
+        'numpy': Mock()
+    }):
+        # Mock the pipeline creation
+        with patch('diffusers.StableDiffusionPipeline') as mock_sd_pipeline:
+            mock_sd_pipeline.from_pretrained.return_value = mock_pipeline
+
+            # Import and test our AI generator
+            from ai_generator import AIGenerator
+
+            # Initialize generator
+            generator = AIGenerator()
+
+            # Load a pipeline to trigger the optimization logic
+            generator._load_pipeline("text_to_image")
+
+            # Verify that the VAE decode spike is handled via tiling
+            assert mock_pipeline.vae.enable_tiling.calls == 1, "VAE tiling not enabled"
+            assert mock_pipeline.vae.enable_slicing.calls == 1, "VAE slicing not enabled"
+            print("✅ VAE tiling and slicing correctly enabled")
+
+            # Verify attention slicing is no longer applied on CPU
+            assert mock_pipeline.enable_attention_slicing.calls == 0, \
+                "attention slicing unexpectedly enabled on CPU"
+            print("✅ UNet attention left unsliced (fast path)")
+
+            # Verify device is CPU
+            assert generator.device == "cpu", f"Expected CPU device, got {generator.device}"
+            print("✅ Device correctly detected as CPU")
+
+            return True
 
 def test_force_cpu_environment():
     """Test that FORCE_CPU environment variable works correctly."""
     print("\n🌍 Testing FORCE_CPU environment variable...")
     
-    try:
-        mock_torch = create_mock_torch()
-        # Make CUDA available but FORCE_CPU should override it
-        mock_torch.cuda.is_available.return_value = True
-        
-        with patch.dict('sys.modules', {'torch': mock_torch}):
-            from config import get_device
-            
-            device = get_device()
-            assert device == "cpu", f"Expected CPU device with FORCE_CPU=1, got {device}"
-            print("✅ FORCE_CPU environment variable correctly overrides CUDA")
-            
-            return True
-            
-    except Exception as e:
-        print(f"❌ FORCE_CPU test failed: {e}")
-        return False
+    mock_torch = copy.copy(_TORCH_PROTOTYPE)
+    # Make CUDA available but FORCE_CPU should override it (replace
+    # the nested namespace so the shared prototype stays untouched)
+    mock_torch.cuda = SimpleNamespace(is_available=lambda: True)
+
+    _reset_modules('config', 'device_utils')
+    with patch.dict('sys.modules', {'torch': mock_torch}):
+        from config import get_device
+
+        device = get_device()
+        assert device == "cpu", f"Expected CPU device with FORCE_CPU=1, got {device}"
+        print("✅ FORCE_CPU environment variable correctly overrides CUDA")
+
+        return True
 
 def test_cpu_optimizations():
     """Test CPU-specific optimizations."""
     print("\n⚡ Testing CPU optimizations...")
     
-    try:
-        from device_utils import detect_device_capabilities, get_optimized_model_params, setup_performance_environment
-        
-        # Test that environment is set up for CPU
-        setup_performance_environment()
-        
-        # Check that CUDA is disabled
-        assert os.environ.get("CUDA_VISIBLE_DEVICES") == "", "CUDA_VISIBLE_DEVICES not properly disabled"
-        print("✅ CUDA_VISIBLE_DEVICES correctly disabled")
-        
-        # Test capabilities
-        capabilities = detect_device_capabilities()
-        assert capabilities["device"] == "cpu", "Device not detected as CPU"
-        print("✅ Device capabilities correctly detected for CPU")
-        
-        # Test optimized parameters
-        params = get_optimized_model_params(capabilities)
-        assert "image" in params and "video" in params, "Optimized parameters not generated"
-        print("✅ CPU-optimized parameters generated")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ CPU optimizations test failed: {e}")
-        return False
+    from device_utils import detect_device_capabilities, get_optimized_model_params, setup_performance_environment
+
+    # Test that environment is set up for CPU
+    setup_performance_environment()
+
+    # Check that CUDA is disabled
+    assert os.environ.get("CUDA_VISIBLE_DEVICES") == "", "CUDA_VISIBLE_DEVICES not properly disabled"
+    print("✅ CUDA_VISIBLE_DEVICES correctly disabled")
+
+    # Pin thread counts so CPU inference behaves like a tuned
+    # deployment; torch's defaults oversubscribe many-core CI boxes
+    os.environ.setdefault("OMP_NUM_THREADS", "2")
+    os.environ.setdefault("MKL_NUM_THREADS", "2")
+    _pin_torch_threads()
+
+    # Test capabilities
+    capabilities = detect_device_capabilities()
+    assert capabilities["device"] == "cpu", "Device not detected as CPU"
+    print("✅ Device capabilities correctly detected for CPU")
+
+    # Test optimized parameters
+    params = get_optimized_model_params(capabilities)
+    assert "image" in params and "video" in params, "Optimized parameters not generated"
+    print("✅ CPU-optimized parameters generated")
+
+    return True
 
 def main():
     """Run simulation tests."""
@@ -144,31 +202,23 @@ def main():
     tests = [
         test_force_cpu_environment,
         test_cpu_optimizations,
-        test_attention_slicing_fallback
+        test_vae_tiling_memory_optimization
     ]
-    
-    passed = 0
-    failed = 0
-    
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-            else:
-                failed += 1
-        except Exception as e:
-            print(f"❌ Test {test.__name__} crashed: {e}")
-            failed += 1
-    
+
+    # These tests patch sys.modules and other process-global import
+    # state, so they cannot overlap; run them serially via the shared
+    # runner to keep crash handling and counting in one place
+    passed, failed = run_tests([], first=tests)
+
     print(f"\n📊 Simulation Test Results: {passed} passed, {failed} failed")
     
     if failed == 0:
         print("🎉 All simulation tests passed!")
         print("\n✨ Key Validations:")
-        print("   • attention_slicing is used instead of xformers")
+        print("   • VAE tiling/slicing is used for the decode memory spike")
         print("   • FORCE_CPU environment variable works correctly")
         print("   • CPU optimizations are properly applied")
-        print("   • Graceful fallback when xformers is not available")
+        print("   • UNet attention stays unsliced for speed")
         return 0
     else:
         print("❌ Some simulation tests failed.")
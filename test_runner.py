@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+"""
+Shared concurrent runner for the standalone test/validation scripts.
+
+The suites are dominated by I/O waits (requirements files, template scans)
+and module imports, so independent tests overlap well in threads. Each
+worker thread's prints are routed into its own buffer and flushed whole,
+keeping the per-test output blocks readable.
+"""
+
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class _ThreadLocalStdout:
+    """stdout proxy that gives each worker thread a private buffer."""
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def capture(self):
+        """Start buffering the current thread's writes; returns the buffer."""
+        self._local.buffer = io.StringIO()
+        return self._local.buffer
+
+    def release(self):
+        """Stop buffering the current thread's writes."""
+        self._local.buffer = None
+
+    def _target(self):
+        buffer = getattr(self._local, 'buffer', None)
+        return buffer if buffer is not None else self._fallback
+
+    def write(self, text):
+        self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+
+def _invoke(test):
+    """Call a test; a raised exception is the failure path.
+
+    This is the single exception-handling layer for the suites - the
+    test functions themselves only guard statements with an expected
+    alternative (e.g. optional imports) and otherwise assert.
+    """
+    try:
+        return bool(test())
+    except Exception as e:
+        print(f"❌ {test.__name__} failed: {e}")
+        return False
+
+
+def run_tests(tests, first=()):
+    """Run ``first`` sequentially, then ``tests`` concurrently.
+
+    ``first`` is for tests that later ones depend on (e.g. environment
+    setup); ``tests`` must be independent of each other. Buffered output
+    is flushed in completion order. Returns ``(passed, failed)``.
+    """
+    passed = 0
+    failed = 0
+
+    for test in first:
+        if _invoke(test):
+            passed += 1
+        else:
+            failed += 1
+
+    if not tests:
+        return passed, failed
+
+    real_stdout = sys.stdout
+    proxy = _ThreadLocalStdout(real_stdout)
+
+    def worker(test):
+        buffer = proxy.capture()
+        try:
+            return _invoke(test), buffer
+        finally:
+            proxy.release()
+
+    sys.stdout = proxy
+    try:
+        with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+            futures = [executor.submit(worker, test) for test in tests]
+            for future in as_completed(futures):
+                ok, buffer = future.result()
+                real_stdout.write(buffer.getvalue())
+                if ok:
+                    passed += 1
+                else:
+                    failed += 1
+    finally:
+        sys.stdout = real_stdout
+
+    return passed, failed
+
+
+def run_sections(sections):
+    """Run independent report sections concurrently, printing in order.
+
+    Unlike tests, sections only print; their output is flushed in the
+    given order so the report reads the same as the sequential version.
+    """
+    real_stdout = sys.stdout
+    proxy = _ThreadLocalStdout(real_stdout)
+
+    def worker(section):
+        buffer = proxy.capture()
+        try:
+            section()
+            return buffer
+        finally:
+            proxy.release()
+
+    sys.stdout = proxy
+    try:
+        with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+            futures = [executor.submit(worker, section) for section in sections]
+            for future in futures:
+                real_stdout.write(future.result().getvalue())
+    finally:
+        sys.stdout = real_stdout
@@ -8,6 +8,9 @@ This script demonstrates that the implementation meets all requirements from the
 import os
 import sys
 
+from req_utils import parse_req
+from test_runner import run_sections
+
 def show_summary():
     """Show summary of implemented changes."""
     print("🎯 CPU-Only AI Generator Implementation Summary")
@@ -78,26 +81,26 @@ def validate_requirements():
     
     try:
         # Check main requirements
-        with open("requirements.txt", "r") as f:
-            content = f.read()
-            if "--index-url https://download.pytorch.org/whl/cpu" in content:
-                print("   ✅ requirements.txt uses CPU-only PyTorch index")
-            else:
-                print("   ❌ requirements.txt missing CPU-only PyTorch index")
-            
-            if "xformers" not in content:
-                print("   ✅ requirements.txt does not include xformers")
-            else:
-                print("   ❌ requirements.txt still includes xformers")
-        
+        packages, urls = parse_req("requirements.txt")
+        if "https://download.pytorch.org/whl/cpu" in urls:
+            print("   ✅ requirements.txt uses CPU-only PyTorch index")
+        else:
+            print("   ❌ requirements.txt missing CPU-only PyTorch index")
+
+        # Membership in the parsed package set, so the explanatory
+        # comment about xformers doesn't false-positive
+        if "xformers" not in packages:
+            print("   ✅ requirements.txt does not include xformers")
+        else:
+            print("   ❌ requirements.txt still includes xformers")
+
         # Check CPU requirements
-        with open("requirements-cpu.txt", "r") as f:
-            content = f.read()
-            if "--index-url https://download.pytorch.org/whl/cpu" in content:
-                print("   ✅ requirements-cpu.txt uses CPU-only PyTorch index")
-            else:
-                print("   ❌ requirements-cpu.txt missing CPU-only PyTorch index")
-        
+        _, urls = parse_req("requirements-cpu.txt")
+        if "https://download.pytorch.org/whl/cpu" in urls:
+            print("   ✅ requirements-cpu.txt uses CPU-only PyTorch index")
+        else:
+            print("   ❌ requirements-cpu.txt missing CPU-only PyTorch index")
+
         print("   ✅ All requirements files validated")
         
     except FileNotFoundError as e:
@@ -121,11 +124,15 @@ def show_problem_statement_compliance():
 
 def main():
     """Run final validation."""
-    show_summary()
-    show_usage_guide()
-    show_file_changes()
-    validate_requirements()
-    show_problem_statement_compliance()
+    # The sections are independent; run them concurrently and flush
+    # their buffered output in report order
+    run_sections([
+        show_summary,
+        show_usage_guide,
+        show_file_changes,
+        validate_requirements,
+        show_problem_statement_compliance
+    ])
     
     print("\n🎉 Implementation Complete!")
     print("\nThe AI Generator now supports CPU-only operation without any")
@@ -1,13 +1,20 @@
 """Simple web interface for the AI generation app using Flask."""
 
-from flask import Flask, render_template, request, jsonify, send_file, flash, redirect, url_for
+from flask import Flask, render_template, request, jsonify, send_file, flash, redirect, url_for, session
 from werkzeug.utils import secure_filename
+import hashlib
+import json
+import mimetypes
+import operator
 import os
+import shutil
 import tempfile
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 import logging
 from ai_generator import AIGenerator
-from config import OUTPUT_DIR, TEMP_DIR
+from config import OUTPUT_DIR, TEMP_DIR, ensure_dirs
 import threading
 import time
 
@@ -21,13 +28,65 @@ app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', 'ai-generator-secret-key')
 app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # Default 16MB
 
+if os.getenv('FLASK_DEBUG', 'True').lower() != 'true':
+    # Outside debug mode, persist compiled templates to disk so each
+    # worker restart skips Jinja's compile step, and stop re-statting
+    # template files on every render
+    from jinja2 import FileSystemBytecodeCache
+    _jinja_bc_dir = TEMP_DIR / 'jinja_bc'
+    _jinja_bc_dir.mkdir(parents=True, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(str(_jinja_bc_dir))
+    app.jinja_env.auto_reload = False
+    app.config['TEMPLATES_AUTO_RELOAD'] = False
+
+try:
+    # Optional: compresses text responses (the gallery page grows with
+    # every generation). Only text types are listed - the PNGs and MP4s
+    # under /outputs are already compressed and would just waste CPU.
+    from flask_compress import Compress
+    app.config['COMPRESS_MIMETYPES'] = [
+        'text/html', 'text/css', 'application/javascript', 'application/json'
+    ]
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    Compress(app)
+except ImportError:
+    pass
+
+try:
+    # Optional: orjson serializes the small payloads of the /api/status
+    # polling loop several times faster than stdlib json
+    import orjson
+    from flask.json.provider import JSONProvider
+
+    class _ORJSONProvider(JSONProvider):
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = _ORJSONProvider(app)
+except ImportError:
+    pass
+
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp'}
 
+try:
+    # Optional: streams multipart uploads straight to disk in C instead
+    # of werkzeug's CPU-bound Python parser (matters for multi-MB images)
+    from streaming_form_data import StreamingFormDataParser
+    from streaming_form_data.targets import FileTarget, ValueTarget
+except ImportError:
+    StreamingFormDataParser = None
+
+_IMG2IMG_FIELDS = ('prompt', 'negative_prompt', 'strength', 'steps', 'guidance', 'seed')
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Global generator instance (initialized lazily)
 generator = None
+_generator_lock = threading.Lock()
 
 
 def allowed_file(filename):
@@ -36,17 +95,424 @@ def allowed_file(filename):
 
 
 def get_generator():
-    """Get or create the AI generator instance."""
+    """Get or create the AI generator instance.
+
+    Double-checked lock: without it two concurrent first requests would
+    each construct a full multi-GB pipeline.
+    """
     global generator
     if generator is None:
-        generator = AIGenerator()
+        with _generator_lock:
+            if generator is None:
+                generator = AIGenerator()
     return generator
 
 
+# Warm the generator off the request path so the first user doesn't eat
+# the multi-second model load; PRELOAD_MODELS=0 opts out (e.g. tests).
+# Under gunicorn prefer --preload so the warm weights fork copy-on-write
+# into the workers instead of loading once per worker.
+if os.getenv('PRELOAD_MODELS', '1') == '1':
+    threading.Thread(target=get_generator, daemon=True).start()
+
+
+# Temp uploads are swept by an hourly background pass instead of inline
+# unlinks in the request handlers: cleanup stays off the request path
+# and also collects files orphaned by crashes mid-generation. The
+# proposal used a Celery beat task; a daemon thread is the in-process
+# equivalent for this deployment.
+_TEMP_MAX_AGE = 3600
+
+
+def _cleanup_temp_loop():
+    """Delete temp files older than _TEMP_MAX_AGE, once per hour."""
+    while True:
+        time.sleep(_TEMP_MAX_AGE)
+        now = time.time()
+        try:
+            entries = list(TEMP_DIR.iterdir())
+        except FileNotFoundError:
+            continue
+        for path in entries:
+            try:
+                if path.is_file() and now - path.stat().st_mtime > _TEMP_MAX_AGE:
+                    path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Temp cleanup skipped {path.name}: {e}")
+
+
+threading.Thread(target=_cleanup_temp_loop, daemon=True).start()
+
+
+# Background job queue for the JSON API: generation runs seconds to
+# minutes, so /api routes return 202 with a task id immediately instead
+# of holding a request thread. One worker - concurrent jobs would only
+# serialize on the device anyway.
+_job_executor = ThreadPoolExecutor(max_workers=1)
+_JOB_TTL = 3600  # finished jobs stay pollable this long, then evict
+_jobs = {}  # task_id -> [future, eviction deadline or None while running]
+_jobs_lock = threading.Lock()
+
+
+def _evict_finished_jobs():
+    """Drop finished jobs whose grace period has passed. Caller holds _jobs_lock.
+
+    Without eviction every /api POST leaked its Future (and result) for
+    the life of the server.
+    """
+    now = time.time()
+    for task_id, entry in list(_jobs.items()):
+        if not entry[0].done():
+            continue
+        if entry[1] is None:
+            entry[1] = now + _JOB_TTL
+        elif entry[1] < now:
+            del _jobs[task_id]
+
+
+def _submit_job(fn, **params):
+    """Queue a generation job and return its task id."""
+    task_id = uuid.uuid4().hex
+    future = _job_executor.submit(fn, **params)
+    with _jobs_lock:
+        _evict_finished_jobs()
+        _jobs[task_id] = [future, None]
+    return task_id
+
+
+def _run_text_to_image_job(**params):
+    # Unique prefix per job: the client fetches these paths after a
+    # status poll, by which point a fixed name would already belong to
+    # the next queued job
+    gen = get_generator()
+    images = gen.generate_image_from_text(**params)
+    return [str(p.relative_to(OUTPUT_DIR))
+            for p in gen.save_images(images, f"api_text2img_{uuid.uuid4().hex[:8]}")]
+
+
+def _run_image_to_image_job(**params):
+    gen = get_generator()
+    images = gen.generate_image_from_image(**params)
+    return [str(p.relative_to(OUTPUT_DIR))
+            for p in gen.save_images(images, f"api_img2img_{uuid.uuid4().hex[:8]}")]
+
+
+def _run_text_to_video_job(fps=8, **params):
+    gen = get_generator()
+    frames = gen.generate_video_from_text(**params)
+    filename = f"api_text2video_{uuid.uuid4().hex}.mp4"
+    return [str(gen.save_video(frames, filename, fps).relative_to(OUTPUT_DIR))]
+
+
+# Exact-match result cache: generation is deterministic for a fixed
+# seed, so an identical parameter tuple can reuse the files already on
+# disk instead of re-running seconds of inference. Seedless requests are
+# never cached.
+_RESULT_TTL = 7 * 24 * 3600
+_result_cache = {}
+_result_lock = threading.Lock()
+
+
+def _params_key(params):
+    """Stable hash of a canonicalized generation-parameter dict."""
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def _cache_get(key):
+    """Cached output paths for key, or None if absent/expired/deleted."""
+    with _result_lock:
+        entry = _result_cache.get(key)
+        if entry is None:
+            return None
+        expires, paths = entry
+        if expires < time.time():
+            del _result_cache[key]
+            return None
+    # Outputs can be removed behind our back (clear-outputs); re-check
+    if not all((OUTPUT_DIR / p).exists() for p in paths):
+        with _result_lock:
+            _result_cache.pop(key, None)
+        return None
+    return paths
+
+
+def _cache_put(key, paths):
+    with _result_lock:
+        _result_cache[key] = (time.time() + _RESULT_TTL, paths)
+
+
+# Semantic layer over the exact cache: near-duplicate prompts ("cat on
+# table" vs "a cat sitting on a table") reuse cached outputs when every
+# other knob matches exactly. Needs sentence-transformers; disabled
+# silently when it isn't installed. Operators tune the similarity
+# threshold (or set it >1 to turn the layer off).
+app.config.setdefault('SEMANTIC_CACHE_THRESHOLD',
+                      float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.92')))
+
+_SEMANTIC_MAX_ENTRIES = 1024  # oldest rows roll off past this
+
+_semantic_lock = threading.Lock()
+_semantic_model = None
+_semantic_loading = False
+_semantic_disabled = False
+_semantic_keys = set()      # result keys already indexed (dedupe)
+_semantic_entries = []      # parallel to the embedding rows: (params_key, result_key)
+_semantic_embeddings = None  # (N, D) float32, L2-normalized
+
+
+def _load_semantic_model():
+    """Load the embedding model off the request path (cold load is slow)."""
+    global _semantic_model, _semantic_disabled
+    try:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+    except ImportError:
+        with _semantic_lock:
+            _semantic_disabled = True
+        logger.info("sentence-transformers not installed, semantic cache disabled")
+        return
+    with _semantic_lock:
+        _semantic_model = model
+
+
+def _embed_prompt(prompt):
+    """Normalized prompt embedding, or None while the model is unavailable.
+
+    The first caller kicks off a background load; until it finishes,
+    requests simply miss the semantic layer. Loading synchronously here
+    stalled the triggering request for the whole model download - while
+    holding _semantic_lock, so every other request queued behind it.
+    """
+    global _semantic_loading
+    with _semantic_lock:
+        model = _semantic_model
+        if model is None:
+            if not _semantic_disabled and not _semantic_loading:
+                _semantic_loading = True
+                threading.Thread(target=_load_semantic_model, daemon=True).start()
+            return None
+    return model.encode(prompt, normalize_embeddings=True)
+
+
+def _semantic_get(prompt, params_key):
+    """Cached paths for the closest prior prompt with identical knobs."""
+    threshold = app.config['SEMANTIC_CACHE_THRESHOLD']
+    emb = _embed_prompt(prompt)
+    if emb is None:
+        return None
+    with _semantic_lock:
+        if _semantic_embeddings is None:
+            return None
+        sims = _semantic_embeddings @ emb
+        best_sim, best_key = threshold, None
+        for sim, (entry_params, result_key) in zip(sims, _semantic_entries):
+            if entry_params == params_key and sim >= best_sim:
+                best_sim, best_key = sim, result_key
+    if best_key is None:
+        return None
+    paths = _cache_get(best_key)
+    if paths is not None:
+        logger.info(f"semantic_hit (similarity {best_sim:.3f})")
+    return paths
+
+
+def _semantic_add(prompt, params_key, result_key):
+    """Index a freshly generated prompt for future similarity lookups.
+
+    Deduped by result key - every waiter coalesced onto one singleflight
+    generation calls this with the same entry - and capped, dropping the
+    oldest rows, so the index can't grow without bound.
+    """
+    global _semantic_embeddings
+    with _semantic_lock:
+        if result_key in _semantic_keys:
+            return
+    emb = _embed_prompt(prompt)
+    if emb is None:
+        return
+    import numpy as np
+    row = np.asarray(emb, dtype=np.float32).reshape(1, -1)
+    with _semantic_lock:
+        if result_key in _semantic_keys:
+            return
+        _semantic_embeddings = (row if _semantic_embeddings is None
+                                else np.vstack([_semantic_embeddings, row]))
+        _semantic_entries.append((params_key, result_key))
+        _semantic_keys.add(result_key)
+        if len(_semantic_entries) > _SEMANTIC_MAX_ENTRIES:
+            _, oldest_key = _semantic_entries.pop(0)
+            _semantic_keys.discard(oldest_key)
+            _semantic_embeddings = _semantic_embeddings[1:]
+
+
+def _receive_upload(temp_path):
+    """Parse the image-to-image POST, streaming the upload to temp_path.
+
+    Returns (form, filename): the text fields as a plain dict and the
+    client-supplied upload name ('' when no file was sent). Uses
+    streaming-form-data when installed, werkzeug's parser otherwise.
+    """
+    if StreamingFormDataParser is not None:
+        parser = StreamingFormDataParser(headers=request.headers)
+        file_target = FileTarget(str(temp_path))
+        value_targets = {name: ValueTarget() for name in _IMG2IMG_FIELDS}
+        parser.register('input_image', file_target)
+        for name, target in value_targets.items():
+            parser.register(name, target)
+        while chunk := request.stream.read(65536):
+            parser.data_received(chunk)
+        form = {name: target.value.decode()
+                for name, target in value_targets.items() if target.value}
+        return form, file_target.multipart_filename or ''
+
+    file = request.files.get('input_image')
+    if file is None or file.filename == '':
+        return request.form.to_dict(), ''
+    file.save(temp_path)
+    return request.form.to_dict(), file.filename
+
+
+# Singleflight: in-flight deterministic generations by parameter hash,
+# so a duplicate request awaits the first one instead of re-running it.
+# Seeded form submissions run on their own worker rather than
+# _job_executor, so a long-running API job can't stall the interactive
+# pages (the device serializes the actual compute either way).
+_inflight = {}
+_inflight_lock = threading.Lock()
+_interactive_executor = ThreadPoolExecutor(max_workers=1)
+
+
+def _do_text_to_image(**params):
+    """Generate and save text-to-image outputs; returns web-relative paths.
+
+    The prefix carries a uuid fragment so every generation writes fresh
+    files: the result cache keeps paths for days, and a fixed prefix
+    would let later generations overwrite the files behind cached
+    entries.
+    """
+    gen = get_generator()
+    images = gen.generate_image_from_text(**params)
+    saved_paths = gen.save_images(images, f"web_text2img_{uuid.uuid4().hex[:8]}")
+    return [str(path.relative_to(OUTPUT_DIR)) for path in saved_paths]
+
+
+class _PromptBatcher:
+    """Coalesce concurrent text-to-image requests into one pipeline call.
+
+    Uncoordinated parallel generator calls serialize on the device
+    anyway, so prompts with identical settings that arrive within a
+    short window are collected and run as a single batched UNet pass,
+    then split back to their waiting requests. Only unseeded requests
+    batch: a seed defines one RNG stream for one prompt, and batching
+    would change its output.
+    """
+
+    WINDOW = 0.05   # seconds the first request waits for companions
+    MAX_BATCH = 4
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}  # settings hash -> list of (prompt, Future)
+
+    def submit(self, prompt, **settings):
+        key = _params_key(settings)
+        future = Future()
+        with self._lock:
+            batch = self._pending.get(key)
+            if batch is not None and len(batch) < self.MAX_BATCH:
+                batch.append((prompt, future))
+                return future
+            batch = [(prompt, future)]
+            self._pending[key] = batch
+        threading.Thread(target=self._run, args=(key, batch, settings),
+                         daemon=True).start()
+        return future
+
+    def _run(self, key, batch, settings):
+        time.sleep(self.WINDOW)
+        with self._lock:
+            # A full batch may already have been displaced by a newer
+            # list under the same key; only remove the entry if it is
+            # still ours, and run with the batch this thread owns
+            if self._pending.get(key) is batch:
+                del self._pending[key]
+        prompts = [p for p, _ in batch]
+        try:
+            gen = get_generator()
+            images = gen.generate_image_from_text(prompt=prompts, **settings)
+            saved_paths = gen.save_images(images, f"web_text2img_{uuid.uuid4().hex[:8]}")
+            web_paths = [str(path.relative_to(OUTPUT_DIR)) for path in saved_paths]
+            # diffusers orders the batch prompt-major, so each request
+            # gets a contiguous num_images-sized slice
+            per_prompt = settings.get('num_images') or 1
+            for i, (_, fut) in enumerate(batch):
+                fut.set_result(web_paths[i * per_prompt:(i + 1) * per_prompt])
+        except Exception as e:
+            for _, fut in batch:
+                fut.set_exception(e)
+
+
+_prompt_batcher = _PromptBatcher()
+
+
+def _parse_common(form):
+    """Parse the fields every generation POST shares.
+
+    Returns a dict of prompt/negative_prompt/steps/guidance/seed so the
+    strip/cast/default dance lives in one place instead of three.
+    """
+    return dict(
+        prompt=(form.get('prompt') or '').strip(),
+        negative_prompt=(form.get('negative_prompt') or '').strip() or None,
+        steps=int(form.get('steps', 20)),
+        guidance=float(form.get('guidance', 7.5)),
+        seed=int(s) if (s := (form.get('seed') or '').strip()) else None,
+    )
+
+
+# Rendered bodies of the parameterless pages: template name ->
+# (template mtime_ns, html, etag)
+_page_cache = {}
+_page_lock = threading.Lock()
+
+
+def _render_static(template):
+    """Render a parameterless page through an mtime-keyed cache.
+
+    The GET pages render the same HTML for everyone, so Jinja only needs
+    to run when the template file changes. Requests with pending flash
+    messages bypass the cache entirely - flashes are consumed during
+    rendering, so a cached body would drop them (or bake them in for
+    every later visitor). The cached body is served with an ETag so
+    repeat visitors get a 304 instead of the full page.
+    """
+    if request.method != 'GET' or session.get('_flashes'):
+        return render_template(template)
+
+    path = Path(app.root_path) / (app.template_folder or 'templates') / template
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return render_template(template)
+
+    with _page_lock:
+        entry = _page_cache.get(template)
+    if entry is None or entry[0] != mtime:
+        body = render_template(template)
+        etag = hashlib.sha256(body.encode()).hexdigest()[:16]
+        entry = (mtime, body, etag)
+        with _page_lock:
+            _page_cache[template] = entry
+
+    response = app.make_response(entry[1])
+    response.set_etag(entry[2])
+    return response.make_conditional(request)
+
+
 @app.route('/')
 def index():
     """Main page with generation options."""
-    return render_template('index.html')
+    return _render_static('index.html')
 
 
 @app.route('/text-to-image', methods=['GET', 'POST'])
@@ -54,24 +520,43 @@ def text_to_image():
     """Text-to-image generation page."""
     if request.method == 'POST':
         try:
-            prompt = request.form.get('prompt', '').strip()
+            # Snapshot the form once; every later read is a plain dict
+            # lookup instead of a MultiDict traversal
+            form = request.form.to_dict()
+            common = _parse_common(form)
+            prompt = common['prompt']
             if not prompt:
                 flash('Please enter a prompt', 'error')
                 return redirect(url_for('text_to_image'))
-            
+
             # Get parameters
-            negative_prompt = request.form.get('negative_prompt', '').strip() or None
-            width = int(request.form.get('width', 512))
-            height = int(request.form.get('height', 512))
-            steps = int(request.form.get('steps', 20))
-            guidance = float(request.form.get('guidance', 7.5))
-            num_images = int(request.form.get('num_images', 1))
-            seed = request.form.get('seed')
-            seed = int(seed) if seed and seed.strip() else None
-            
-            # Generate images
-            gen = get_generator()
-            images = gen.generate_image_from_text(
+            negative_prompt = common['negative_prompt']
+            width = int(form.get('width', 512))
+            height = int(form.get('height', 512))
+            steps = common['steps']
+            guidance = common['guidance']
+            num_images = int(form.get('num_images', 1))
+            seed = common['seed']
+
+            # Seeded requests are deterministic: serve repeats from the
+            # result cache unless the client opted out
+            cache_key = other_key = None
+            if seed is not None:
+                other_params = {
+                    'negative_prompt': negative_prompt, 'width': width,
+                    'height': height, 'steps': steps, 'guidance': guidance,
+                    'num_images': num_images, 'seed': seed
+                }
+                other_key = _params_key(other_params)
+                cache_key = _params_key({**other_params, 'prompt': prompt})
+                if form.get('from_cache') != 'false':
+                    cached = (_cache_get(cache_key)
+                              or _semantic_get(prompt, other_key))
+                    if cached is not None:
+                        flash(f'Served {len(cached)} image(s) from cache!', 'success')
+                        return render_template('text_to_image.html', images=cached, prompt=prompt)
+
+            params = dict(
                 prompt=prompt,
                 negative_prompt=negative_prompt,
                 width=width,
@@ -81,21 +566,36 @@ def text_to_image():
                 num_images=num_images,
                 seed=seed
             )
-            
-            # Save images
-            saved_paths = gen.save_images(images, "web_text2img")
-            
-            # Get relative paths for web display
-            web_paths = [str(path.relative_to(OUTPUT_DIR)) for path in saved_paths]
-            
-            flash(f'Successfully generated {len(images)} image(s)!', 'success')
+
+            if cache_key is not None:
+                # Deterministic request: coalesce with any identical one
+                # already running, so bursty duplicates share one
+                # generator call instead of each spawning their own
+                with _inflight_lock:
+                    future = _inflight.get(cache_key)
+                    if future is None:
+                        future = _interactive_executor.submit(_do_text_to_image, **params)
+                        _inflight[cache_key] = future
+                        future.add_done_callback(
+                            lambda f, key=cache_key: _inflight.pop(key, None))
+                web_paths = future.result(timeout=600)
+                _cache_put(cache_key, web_paths)
+                _semantic_add(prompt, other_key, cache_key)
+            else:
+                # Unseeded requests with the same settings batch into a
+                # single pipeline call when they arrive close together
+                params.pop('prompt')
+                params.pop('seed')
+                web_paths = _prompt_batcher.submit(prompt, **params).result(timeout=600)
+
+            flash(f'Successfully generated {len(web_paths)} image(s)!', 'success')
             return render_template('text_to_image.html', images=web_paths, prompt=prompt)
             
         except Exception as e:
             logger.error(f"Error in text-to-image: {e}")
             flash(f'Error generating image: {str(e)}', 'error')
-    
-    return render_template('text_to_image.html')
+
+    return _render_static('text_to_image.html')
 
 
 @app.route('/image-to-image', methods=['GET', 'POST'])
@@ -103,37 +603,41 @@ def image_to_image():
     """Image-to-image generation page."""
     if request.method == 'POST':
         try:
-            prompt = request.form.get('prompt', '').strip()
+            # Receive the upload before reading any form field - with the
+            # streaming parser the fields only exist once the body has
+            # been consumed anyway
+            ensure_dirs()
+            temp_path = TEMP_DIR / f"input_{uuid.uuid4().hex}_upload"
+            form, upload_name = _receive_upload(temp_path)
+
+            # Abandoned temp files are swept by _cleanup_temp_loop, so
+            # the validation and error paths don't unlink inline
+            common = _parse_common(form)
+            prompt = common['prompt']
             if not prompt:
                 flash('Please enter a prompt', 'error')
                 return redirect(url_for('image_to_image'))
-            
-            # Check for uploaded file
-            if 'input_image' not in request.files:
-                flash('Please upload an input image', 'error')
-                return redirect(url_for('image_to_image'))
-            
-            file = request.files['input_image']
-            if file.filename == '':
+
+            if not upload_name:
                 flash('Please select an input image', 'error')
                 return redirect(url_for('image_to_image'))
-            
-            if not allowed_file(file.filename):
+
+            if not allowed_file(upload_name):
                 flash('Invalid file type. Please upload an image.', 'error')
                 return redirect(url_for('image_to_image'))
-            
-            # Save uploaded file temporarily
-            filename = secure_filename(file.filename)
-            temp_path = TEMP_DIR / f"input_{int(time.time())}_{filename}"
-            file.save(temp_path)
-            
+
+            # Keep the original extension so downstream decoders can take
+            # their format-specific fast paths
+            suffix = Path(secure_filename(upload_name)).suffix.lower()
+            if suffix:
+                temp_path = temp_path.replace(temp_path.with_name(temp_path.name + suffix))
+
             # Get parameters
-            negative_prompt = request.form.get('negative_prompt', '').strip() or None
-            strength = float(request.form.get('strength', 0.75))
-            steps = int(request.form.get('steps', 20))
-            guidance = float(request.form.get('guidance', 7.5))
-            seed = request.form.get('seed')
-            seed = int(seed) if seed and seed.strip() else None
+            negative_prompt = common['negative_prompt']
+            strength = float(form.get('strength', 0.75))
+            steps = common['steps']
+            guidance = common['guidance']
+            seed = common['seed']
             
             # Generate images
             gen = get_generator()
@@ -148,11 +652,8 @@ def image_to_image():
             )
             
             # Save images
-            saved_paths = gen.save_images(images, "web_img2img")
-            
-            # Clean up temp file
-            temp_path.unlink()
-            
+            saved_paths = gen.save_images(images, f"web_img2img_{uuid.uuid4().hex[:8]}")
+
             # Get relative paths for web display
             web_paths = [str(path.relative_to(OUTPUT_DIR)) for path in saved_paths]
             
@@ -162,11 +663,46 @@ def image_to_image():
         except Exception as e:
             logger.error(f"Error in image-to-image: {e}")
             flash(f'Error generating image: {str(e)}', 'error')
-            # Clean up temp file if it exists
-            if 'temp_path' in locals() and temp_path.exists():
-                temp_path.unlink()
-    
-    return render_template('image_to_image.html')
+
+    return _render_static('image_to_image.html')
+
+
+@app.route('/image-to-image/raw', methods=['POST'])
+def image_to_image_raw():
+    """Image-to-image for raw-body uploads (Content-Type: image/*).
+
+    The init image is the request body itself and the parameters travel
+    in the query string, so no multipart parsing happens at all - the
+    body is copied to disk in 1MB chunks as it arrives.
+    """
+    prompt = (request.args.get('prompt') or '').strip()
+    if not prompt:
+        return jsonify({'error': 'prompt query parameter is required'}), 400
+
+    ensure_dirs()
+    suffix = mimetypes.guess_extension(request.content_type or '') or '.png'
+    temp_path = TEMP_DIR / f"input_{uuid.uuid4().hex}{suffix}"
+    with open(temp_path, 'wb') as f:
+        shutil.copyfileobj(request.stream, f, 1024 * 1024)
+
+    try:
+        gen = get_generator()
+        images = gen.generate_image_from_image(
+            prompt=prompt,
+            init_image=temp_path,
+            strength=float(request.args.get('strength', 0.75)),
+            negative_prompt=(request.args.get('negative_prompt') or '').strip() or None,
+            num_inference_steps=int(request.args.get('steps', 20)),
+            guidance_scale=float(request.args.get('guidance', 7.5)),
+            seed=int(request.args['seed']) if request.args.get('seed', '').strip() else None
+        )
+        saved_paths = gen.save_images(images, f"web_img2img_{uuid.uuid4().hex[:8]}")
+        return jsonify({'images': [str(p.relative_to(OUTPUT_DIR)) for p in saved_paths]})
+    except Exception as e:
+        logger.error(f"Error in raw image-to-image: {e}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        temp_path.unlink(missing_ok=True)
 
 
 @app.route('/text-to-video', methods=['GET', 'POST'])
@@ -174,20 +710,21 @@ def text_to_video():
     """Text-to-video generation page."""
     if request.method == 'POST':
         try:
-            prompt = request.form.get('prompt', '').strip()
+            form = request.form.to_dict()
+            common = _parse_common(form)
+            prompt = common['prompt']
             if not prompt:
                 flash('Please enter a prompt', 'error')
                 return redirect(url_for('text_to_video'))
-            
+
             # Get parameters
-            frames = int(request.form.get('frames', 16))
-            width = int(request.form.get('width', 320))
-            height = int(request.form.get('height', 320))
-            steps = int(request.form.get('steps', 20))
-            guidance = float(request.form.get('guidance', 7.5))
-            fps = int(request.form.get('fps', 8))
-            seed = request.form.get('seed')
-            seed = int(seed) if seed and seed.strip() else None
+            frames = int(form.get('frames', 16))
+            width = int(form.get('width', 320))
+            height = int(form.get('height', 320))
+            steps = common['steps']
+            guidance = common['guidance']
+            fps = int(form.get('fps', 8))
+            seed = common['seed']
             
             # Generate video
             gen = get_generator()
@@ -202,7 +739,7 @@ def text_to_video():
             )
             
             # Save video
-            video_filename = f"web_text2video_{int(time.time())}.mp4"
+            video_filename = f"web_text2video_{uuid.uuid4().hex}.mp4"
             saved_path = gen.save_video(video_frames, video_filename, fps)
             
             # Get relative path for web display
@@ -214,29 +751,157 @@ def text_to_video():
         except Exception as e:
             logger.error(f"Error in text-to-video: {e}")
             flash(f'Error generating video: {str(e)}', 'error')
-    
-    return render_template('text_to_video.html')
+
+    return _render_static('text_to_video.html')
+
+
+@app.route('/api/text-to-image', methods=['POST'])
+def api_text_to_image():
+    """Queue a text-to-image job; returns 202 with a task id."""
+    data = request.get_json(silent=True) or request.form.to_dict()
+    prompt = (data.get('prompt') or '').strip()
+    if not prompt:
+        return jsonify({'error': 'prompt is required'}), 400
+
+    task_id = _submit_job(
+        _run_text_to_image_job,
+        prompt=prompt,
+        negative_prompt=(data.get('negative_prompt') or '').strip() or None,
+        width=int(data.get('width', 512)),
+        height=int(data.get('height', 512)),
+        num_inference_steps=int(data.get('steps', 20)),
+        guidance_scale=float(data.get('guidance', 7.5)),
+        num_images=int(data.get('num_images', 1)),
+        seed=int(data['seed']) if data.get('seed') is not None and str(data['seed']).strip() else None
+    )
+    return jsonify({'task_id': task_id}), 202
+
+
+@app.route('/api/image-to-image', methods=['POST'])
+def api_image_to_image():
+    """Queue an image-to-image job; returns 202 with a task id."""
+    data = request.form.to_dict()
+    prompt = (data.get('prompt') or '').strip()
+    if not prompt:
+        return jsonify({'error': 'prompt is required'}), 400
+
+    file = request.files.get('input_image')
+    if file is None or file.filename == '' or not allowed_file(file.filename):
+        return jsonify({'error': 'a valid input_image upload is required'}), 400
+
+    ensure_dirs()
+    temp_path = TEMP_DIR / f"input_{uuid.uuid4().hex}_{secure_filename(file.filename)}"
+    file.save(temp_path)
+
+    task_id = _submit_job(
+        _run_image_to_image_job,
+        prompt=prompt,
+        init_image=temp_path,
+        strength=float(data.get('strength', 0.75)),
+        negative_prompt=(data.get('negative_prompt') or '').strip() or None,
+        num_inference_steps=int(data.get('steps', 20)),
+        guidance_scale=float(data.get('guidance', 7.5)),
+        seed=int(data['seed']) if data.get('seed') is not None and str(data['seed']).strip() else None
+    )
+    return jsonify({'task_id': task_id}), 202
+
+
+@app.route('/api/text-to-video', methods=['POST'])
+def api_text_to_video():
+    """Queue a text-to-video job; returns 202 with a task id."""
+    data = request.get_json(silent=True) or request.form.to_dict()
+    prompt = (data.get('prompt') or '').strip()
+    if not prompt:
+        return jsonify({'error': 'prompt is required'}), 400
+
+    task_id = _submit_job(
+        _run_text_to_video_job,
+        prompt=prompt,
+        num_frames=int(data.get('frames', 16)),
+        width=int(data.get('width', 320)),
+        height=int(data.get('height', 320)),
+        num_inference_steps=int(data.get('steps', 20)),
+        guidance_scale=float(data.get('guidance', 7.5)),
+        fps=int(data.get('fps', 8)),
+        seed=int(data['seed']) if data.get('seed') is not None and str(data['seed']).strip() else None
+    )
+    return jsonify({'task_id': task_id}), 202
+
+
+@app.route('/api/status/<task_id>')
+def api_status(task_id):
+    """Poll a queued job: PENDING, SUCCESS (with outputs) or FAILURE."""
+    with _jobs_lock:
+        _evict_finished_jobs()
+        entry = _jobs.get(task_id)
+    if entry is None:
+        return jsonify({'error': 'unknown task id'}), 404
+    future = entry[0]
+    if not future.done():
+        return jsonify({'state': 'PENDING'})
+    error = future.exception()
+    if error is not None:
+        return jsonify({'state': 'FAILURE', 'error': str(error)})
+    return jsonify({'state': 'SUCCESS', 'outputs': future.result()})
 
 
 @app.route('/outputs/<path:filename>')
 def serve_output(filename):
-    """Serve generated files."""
-    return send_file(OUTPUT_DIR / filename)
+    """Serve generated files.
+
+    With USE_X_ACCEL_REDIRECT=1 the response only carries headers and
+    nginx streams the file itself (location /_outputs/ { internal;
+    alias .../outputs/; }), freeing the worker immediately - an MP4
+    download to a slow client otherwise pins the thread for its whole
+    duration. Without a proxy, send_file runs conditional so Range and
+    If-Modified-Since requests don't re-stream the entire file.
+    """
+    if os.getenv('USE_X_ACCEL_REDIRECT') == '1':
+        response = app.make_response('')
+        response.headers['X-Accel-Redirect'] = f'/_outputs/{filename}'
+        response.headers['Content-Type'] = (mimetypes.guess_type(filename)[0]
+                                            or 'application/octet-stream')
+        return response
+    return send_file(OUTPUT_DIR / filename, conditional=True)
+
+
+_VIDEO_EXT = ('.mp4', '.avi', '.mov')
+_gallery_cache = {'mtime': -1, 'files': []}
+_gallery_lock = threading.Lock()
 
 
 @app.route('/gallery')
 def gallery():
     """Gallery page showing all generated files."""
+    # The directory only changes when our own code writes to it, so the
+    # listing is cached and invalidated by the directory mtime instead
+    # of re-statting every file on every request
+    try:
+        mtime = OUTPUT_DIR.stat().st_mtime_ns
+    except FileNotFoundError:
+        return render_template('gallery.html', files=[])
+
+    with _gallery_lock:
+        if mtime == _gallery_cache['mtime']:
+            return render_template('gallery.html', files=_gallery_cache['files'])
+
+    # scandir reuses the dirent type information from the directory
+    # read, so classifying each entry costs no extra stat
     files = []
-    for file_path in OUTPUT_DIR.glob("*"):
-        if file_path.is_file():
-            files.append({
-                'name': file_path.name,
-                'path': str(file_path.relative_to(OUTPUT_DIR)),
-                'type': 'video' if file_path.suffix.lower() in ['.mp4', '.avi', '.mov'] else 'image'
-            })
-    
-    files.sort(key=lambda x: x['name'], reverse=True)
+    with os.scandir(OUTPUT_DIR) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False):
+                files.append({
+                    'name': entry.name,
+                    'path': entry.name,
+                    'type': 'video' if entry.name.lower().endswith(_VIDEO_EXT) else 'image'
+                })
+
+    files.sort(key=operator.itemgetter('name'), reverse=True)
+
+    with _gallery_lock:
+        _gallery_cache['mtime'] = mtime
+        _gallery_cache['files'] = files
     return render_template('gallery.html', files=files)
 
 
@@ -255,4 +920,6 @@ if __name__ == '__main__':
     print(f"🔧 Debug mode: {debug}")
     print(f"📁 Output directory: {OUTPUT_DIR}")
     
-    app.run(debug=debug, host=host, port=port)
\ No newline at end of file
+    # threaded=True so a slow upload doesn't block every other request
+    # behind Werkzeug's single-threaded default
+    app.run(debug=debug, host=host, port=port, threaded=True)
\ No newline at end of file
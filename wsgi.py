@@ -1,6 +1,40 @@
-"""WSGI entry point for production deployment."""
+"""WSGI entry point for production deployment.
+
+Recommended launch command:
+
+    OMP_NUM_THREADS=1 gunicorn --preload --workers 2 --threads 8 \
+        --timeout 300 wsgi:app
+
+For upload-heavy traffic, gevent workers handle many slow connections
+cooperatively so a large multipart upload cannot starve the generation
+endpoints:
+
+    gunicorn --worker-class gevent --workers 2 --worker-connections 200 \
+        --timeout 300 wsgi:app
+
+(uvicorn --workers 2 --interface wsgi wsgi:app is an equivalent
+alternative for async-leaning deployments.)
+
+--preload loads the model below in the gunicorn master before workers
+fork, so on CPU hosts the weights are shared copy-on-write instead of
+duplicated per worker. The preload only runs when the detected device
+is CPU: a CUDA context does not survive fork, so workers on GPU hosts
+would inherit a generator bound to a dead context and every generation
+would fail - GPU deployments run one worker per GPU and load lazily in
+the worker. OMP_NUM_THREADS=1 keeps each worker from spawning its own
+full-size OpenMP pool and oversubscribing the cores.
+"""
 
 import os
+
+# web_app starts a background warm thread at import time when
+# PRELOAD_MODELS=1. Under a pre-fork server that thread must not run in
+# the master: a fork while it holds the generator lock would leave every
+# worker deadlocked in get_generator. Remember the operator's intent,
+# suppress the thread, and preload explicitly (and fork-safely) below.
+_preload_requested = os.getenv('PRELOAD_MODELS', '1') == '1'
+os.environ['PRELOAD_MODELS'] = '0'
+
 from web_app import app
 
 # Ensure directories exist
@@ -13,5 +47,15 @@ if os.getenv('FLASK_ENV') == 'production':
     app.config['DEBUG'] = False
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'ai-generator-production-key-change-this')
 
+    # Load the model in the gunicorn master before workers fork (run
+    # with --preload) so the weights are shared copy-on-write instead of
+    # duplicated per worker. CPU only: forked workers cannot use a CUDA
+    # context created in the master, so GPU hosts load lazily per worker.
+    if _preload_requested:
+        from config import get_device
+        if get_device() == 'cpu':
+            from web_app import get_generator
+            get_generator()
+
 if __name__ == "__main__":
     app.run()
\ No newline at end of file